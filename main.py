@@ -1,12 +1,18 @@
 import os
-import requests
+import time
+import asyncio
+import httpx
 import logging
+from contextlib import asynccontextmanager, suppress
+from copy import deepcopy
+from urllib.parse import quote, urlencode
 from dotenv import load_dotenv
 from fastmcp import FastMCP
 from typing import Optional, List, Union
-import xml.etree.ElementTree as ET
+from lxml import etree
 import html
-import json
+import orjson
+from cachetools import TTLCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -16,7 +22,75 @@ load_dotenv()
 
 # --- Google Reader API Client ---
 
+def _add_field(mapping: dict, key: str, value):
+    """Stores `value` under `key`, collecting repeated keys (e.g. several <link>s) into a list."""
+    if key not in mapping:
+        mapping[key] = value
+    elif isinstance(mapping[key], list):
+        mapping[key].append(value)
+    else:
+        mapping[key] = [mapping[key], value]
+
+
+# Atom elements whose children are (X)HTML markup rather than structured data
+TEXT_CONSTRUCTS = frozenset({'title', 'subtitle', 'summary', 'content', 'rights'})
+
+
+def _inner_markup(element) -> str:
+    """Serializes an element's children back to HTML, keeping text between and after child tags."""
+    markup = element.text or ''
+    for child in element:
+        # Drop namespaces from a copy so inherited xmlns declarations don't leak into the HTML
+        child = deepcopy(child)
+        for node in child.iter(tag=etree.Element):
+            node.tag = etree.QName(node).localname
+        etree.cleanup_namespaces(child)
+        markup += etree.tostring(child, method='html', encoding='unicode')
+    return markup
+
+
+def _element_to_dict(element):
+    """Converts an XML element into plain dicts and strings keyed by local tag/attribute names."""
+    text = (element.text or '').strip()
+    if not len(element) and not element.attrib:
+        return text
+    result = {etree.QName(name).localname: value for name, value in element.attrib.items()}
+    # Mixed content would lose its .tail text if recursed into, so it is kept as markup
+    if len(element) and (
+        etree.QName(element).localname in TEXT_CONSTRUCTS
+        or any((child.tail or '').strip() for child in element)
+    ):
+        result['text'] = _inner_markup(element).strip()
+        return result
+    if text:
+        result['text'] = text
+    for child in element:
+        if isinstance(child.tag, str):
+            _add_field(result, etree.QName(child).localname, _element_to_dict(child))
+    return result
+
+
 class GoogleReaderClient:
+    # GET endpoints whose responses change slowly enough to be served from a short-lived cache
+    CACHEABLE_ENDPOINTS = frozenset({
+        'subscription/list', 'tag/list', 'unread-count', 'preference/list', 'friend/list', 'user-info'
+    })
+    # Cached endpoints made stale by a successful POST to the key endpoint
+    INVALIDATED_BY = {
+        'subscription/edit': ('subscription/list', 'tag/list', 'unread-count'),
+        'subscription/quickadd': ('subscription/list', 'unread-count'),
+        'mark-all-as-read': ('unread-count',),
+        'edit-tag': ('tag/list', 'unread-count'),
+        'disable-tag': ('subscription/list', 'tag/list', 'unread-count'),
+        'tag/edit': ('tag/list',),
+    }
+    # Transient failures retried with exponential backoff before surfacing an error
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    MAX_RETRIES = 3
+    RETRY_BACKOFF = 0.3
+    # Upper bound on a server-requested Retry-After wait, so a tool call never stalls for long
+    MAX_RETRY_AFTER = 30
+
     def __init__(self):
         self.email = os.getenv("GOOGLE_READER_EMAIL")
         self.password = os.getenv("GOOGLE_READER_PASSWD")
@@ -24,139 +98,375 @@ class GoogleReaderClient:
         self.sid = None
         self.auth = None
         self.token = None
+        self._token_acquired = 0.0
+        # Seconds before a token is proactively refreshed (tokens are typically valid for ~1h)
+        self._token_ttl = int(os.getenv("GOOGLE_READER_TOKEN_TTL", "3000"))
 
         if not all([self.email, self.password, self.base_url]):
             raise ValueError("Missing required environment variables: GOOGLE_READER_EMAIL, GOOGLE_READER_PASSWD, GOOGLE_READER_BASE_URL")
 
-    def _login(self):
+        # URL prefixes never change, so they are built once instead of on every request
+        self.reader_url = f"{self.base_url.rstrip('/')}/reader"
+        self.api_url = f"{self.reader_url}/api/0"
+
+        self._client = None
+        self._cache = TTLCache(maxsize=128, ttl=30)
+        # Bumped per endpoint on invalidation so in-flight GETs don't cache pre-write data
+        self._cache_generations = {}
+        # Serializes login/token refresh so concurrent 401s trigger a single refresh
+        self._token_lock = asyncio.Lock()
+        # libxml2 parser reused for every XML response; `recover` salvages malformed feeds
+        self._xml_parser = etree.XMLParser(huge_tree=True, recover=True, remove_blank_text=True)
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Returns the shared HTTP client, (re)creating it if it has been closed."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+                timeout=30,
+                # Match requests' behaviour so http->https or trailing-slash redirects keep working
+                follow_redirects=True,
+                # Feed and stream payloads compress well; httpx decodes br via the brotli extra
+                headers={'Accept-Encoding': 'gzip, deflate, br', 'User-Agent': 'rss-mcp-server/0.1.0'}
+            )
+            if self.auth:
+                self._apply_auth(self._client)
+        return self._client
+
+    def _apply_auth(self, http: httpx.AsyncClient):
+        """Attaches the login credentials to the shared client so requests don't rebuild them."""
+        http.headers['Authorization'] = f'GoogleLogin auth={self.auth}'
+        http.cookies.set('SID', self.sid)
+
+    async def aclose(self):
+        """Closes the shared HTTP client and its pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+
+    async def _login(self):
         """Logs in to the API to get SID and Auth tokens."""
         login_url = f"{self.base_url}/accounts/ClientLogin"
         params = {'Email': self.email, 'Passwd': self.password}
         try:
-            response = requests.post(login_url, data=params)
+            response = await self._send("POST", login_url, data=params)
             response.raise_for_status()
-            data = response.text.strip().split('\n')
-            self.sid = [line for line in data if line.startswith('SID=')][0].split('=')[1]
-            self.auth = [line for line in data if line.startswith('Auth=')][0].split('=')[1]
+            data = dict(line.split('=', 1) for line in response.text.splitlines() if '=' in line)
+            self.sid = data['SID']
+            self.auth = data['Auth']
+            self._apply_auth(self.http)
             logging.info("Login successful.")
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logging.error(f"Login failed: {e}")
             raise Exception(f"Login failed: {e}")
-        except IndexError:
+        except KeyError:
             logging.error(f"Failed to parse login response: {response.text}")
             raise Exception(f"Failed to parse login response: {response.text}")
 
-    def _get_token(self):
+    async def _get_token(self):
         """Fetches the T token required for subsequent API calls."""
         if not self.auth:
-            self._login()
+            await self._login()
         
-        token_url = f"{self.base_url}/reader/api/0/token"
-        headers = {'Authorization': f'GoogleLogin auth={self.auth}'}
+        token_url = f"{self.api_url}/token"
         try:
-            response = requests.get(token_url, headers=headers)
+            response = await self._send("GET", token_url)
             response.raise_for_status()
             self.token = response.text.strip()
+            self._token_acquired = time.monotonic()
             logging.info("Token acquired.")
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logging.error(f"Failed to get token: {e}")
             raise Exception(f"Failed to get token: {e}")
 
-    def ensure_authenticated(self):
+    def _token_is_fresh(self):
+        """Returns True if a token is held and has not outlived its TTL."""
+        return bool(self.token) and time.monotonic() - self._token_acquired < self._token_ttl
+
+    async def ensure_authenticated(self):
         """Ensures that the client is authenticated and has a valid token."""
-        if not self.token:
-            self._get_token()
+        if not self._token_is_fresh():
+            async with self._token_lock:
+                if not self._token_is_fresh():
+                    await self._get_token()
+
+    def _parse_response(self, response: httpx.Response):
+        """Decodes a response body as JSON or XML based on its Content-Type, falling back to text."""
+        content_type = response.headers.get('Content-Type', '')
+        # JSON and XML bodies are parsed from raw bytes; the parsers resolve escapes themselves
+        if 'json' in content_type:
+            try:
+                return orjson.loads(response.content)
+            except orjson.JSONDecodeError as je:
+                logging.error(f"Failed to parse JSON response: {je}")
+                return response.text
+        elif 'xml' in content_type:
+            try:
+                root = etree.fromstring(response.content, self._xml_parser)
+            except etree.XMLSyntaxError as pe:
+                logging.error(f"Failed to parse XML response: {pe}")
+                return response.text
+            return root if root is not None else response.text
+        return html.unescape(response.text)
+
+    async def _stream_feed(self, response: httpx.Response):
+        """
+        Incrementally parses an Atom feed response, clearing each top-level element once it has been
+        converted so the XML tree never holds the whole feed (the returned dicts still hold every entry).
+        """
+        parser = etree.XMLPullParser(events=('start', 'end'), huge_tree=True, recover=True)
+        feed = {}
+        entries = []
+        depth = 0
+
+        def drain():
+            nonlocal depth
+            for event, element in parser.read_events():
+                if event == 'start':
+                    depth += 1
+                    continue
+                depth -= 1
+                # Only direct children of the root (feed metadata and entries) are kept
+                if depth != 1:
+                    continue
+                name = etree.QName(element).localname
+                if name == 'entry':
+                    entries.append(_element_to_dict(element))
+                else:
+                    _add_field(feed, name, _element_to_dict(element))
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+
+        try:
+            async for chunk in response.aiter_bytes():
+                parser.feed(chunk)
+                drain()
+            parser.close()
+            drain()
+        except etree.XMLSyntaxError as pe:
+            logging.error(f"Failed to parse XML feed: {pe}")
+            raise Exception(f"Failed to parse XML feed: {pe}")
+        feed['entries'] = entries
+        return feed
+
+    def invalidate_cache(self, *endpoints: str):
+        """Drops cached responses for the given endpoints."""
+        for endpoint in endpoints:
+            self._cache_generations[endpoint] = self._cache_generations.get(endpoint, 0) + 1
+        for key in list(self._cache.keys()):
+            if key[0] in endpoints:
+                self._cache.pop(key, None)
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Returns the wait before the next attempt, honouring a numeric Retry-After header up to a cap."""
+        retry_after = response.headers.get('Retry-After', '') if response is not None else ''
+        if retry_after.isdigit():
+            return min(float(retry_after), self.MAX_RETRY_AFTER)
+        return self.RETRY_BACKOFF * (2 ** attempt)
+
+    async def _send(self, method, url, stream: bool = False, **kwargs) -> httpx.Response:
+        """
+        Sends a request, retrying transient failures on the warm connection pool.
+        The connection is released straight away if the final response is not a success.
+        """
+        for attempt in range(self.MAX_RETRIES + 1):
+            is_last = attempt == self.MAX_RETRIES
+            try:
+                response = await self.http.send(self.http.build_request(method, url, **kwargs), stream=stream)
+            except httpx.TransportError as e:
+                if is_last:
+                    raise
+                delay = self._retry_delay(attempt)
+                logging.warning(f"Request to {url} failed ({e}). Retrying in {delay:.1f}s.")
+            else:
+                if is_last or response.status_code not in self.RETRY_STATUSES:
+                    break
+                await response.aclose()
+                delay = self._retry_delay(attempt, response)
+                logging.warning(f"Request to {url} returned {response.status_code}. Retrying in {delay:.1f}s.")
+            await asyncio.sleep(delay)
+        if not response.is_success:
+            await response.aclose()
+        return response
+
+    async def make_request(self, method, endpoint: Optional[str], use_api_0_path: bool = True, full_url: Optional[str] = None, stream_xml: bool = False, **kwargs):
+        """
+        Makes an authenticated request to the API.
+        With `stream_xml`, an Atom response is parsed incrementally and returned as a dict of feed fields plus 'entries'.
+        """
+        params = kwargs.get("params", {})
+        cache_key = None
+        # XML results are mutable element trees, so only JSON/text responses are shared
+        if method == "GET" and endpoint in self.CACHEABLE_ENDPOINTS and params.get('output') != 'xml':
+            cache_key = (endpoint, frozenset(params.items()))
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return cached
+            generation = self._cache_generations.get(endpoint, 0)
 
-    def make_request(self, method, endpoint: Optional[str], use_api_0_path: bool = True, full_url: Optional[str] = None, **kwargs):
-        """Makes an authenticated request to the API."""
-        self.ensure_authenticated()
+        await self.ensure_authenticated()
 
         if full_url:
             url = full_url
         elif endpoint:
-            base = self.base_url.rstrip('/')
             if use_api_0_path:
-                url = f"{base}/reader/api/0/{endpoint}"
+                url = f"{self.api_url}/{endpoint}"
             else:
                 # Handle special endpoints like 'directory/search'
-                url = f"{base}/reader/{endpoint}"
+                url = f"{self.reader_url}/{endpoint}"
         else:
             raise ValueError("Either 'endpoint' or 'full_url' must be provided.")
 
-        headers = kwargs.get("headers", {})
-        headers['Authorization'] = f'GoogleLogin auth={self.auth}'
-        
-        cookies = kwargs.get("cookies", {})
-        cookies['SID'] = self.sid
-        
-        params = kwargs.get("params", {})
         params['T'] = self.token
         params.setdefault('client', 'fastmcp-server')
 
-        kwargs["headers"] = headers
-        kwargs["cookies"] = cookies
         kwargs["params"] = params
 
         try:
-            response = requests.request(method, url, **kwargs)
-            response.raise_for_status()
-            unescaped_text = html.unescape(response.text)
-            content_type = response.headers.get('Content-Type', '')
-            if 'json' in content_type:
-                try:
-                    return json.loads(unescaped_text)
-                except json.JSONDecodeError as je:
-                    logging.error(f"Failed to parse JSON response after unescaping: {je}")
-                    return unescaped_text
-            elif 'xml' in content_type:
-                try:
-                    return ET.fromstring(unescaped_text.encode('utf-8'))
-                except ET.ParseError as pe:
-                    logging.error(f"Failed to parse XML response: {pe}")
-                    return unescaped_text
-            return unescaped_text
-        except requests.exceptions.RequestException as e:
-            if e.response is not None and (e.response.status_code == 401 or e.response.headers.get('X-Reader-Google-Bad-Token') == 'true'):
+            response = await self._send(method, url, stream=stream_xml, **kwargs)
+            # Check for a rejected token before raise_for_status so the retry needs no exception
+            if response.status_code == 401 or response.headers.get('X-Reader-Google-Bad-Token') == 'true':
                 logging.warning("Token expired or invalid (401). Re-authenticating and retrying.")
-                self._get_token()
+                # Only drop the token if no concurrent request has refreshed it already
+                if self.token == params['T']:
+                    self.token = None
+                await self.ensure_authenticated()
                 params['T'] = self.token
-                kwargs["params"] = params
-                
+
                 # Retry the request
-                response = requests.request(method, url, **kwargs)
-                response.raise_for_status()
-                
-                unescaped_text = html.unescape(response.text)
-                content_type = response.headers.get('Content-Type', '')
-                if 'json' in content_type:
-                    try:
-                        return json.loads(unescaped_text)
-                    except json.JSONDecodeError as je:
-                        logging.error(f"Failed to parse JSON response after unescaping on retry: {je}")
-                        return unescaped_text
-                elif 'xml' in content_type:
-                    try:
-                        return ET.fromstring(unescaped_text.encode('utf-8'))
-                    except ET.ParseError as pe:
-                        logging.error(f"Failed to parse XML response on retry: {pe}")
-                        return unescaped_text
-                return unescaped_text
-            
+                response = await self._send(method, url, stream=stream_xml, **kwargs)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
             logging.error(f"API request to {endpoint} failed: {e}")
             raise Exception(f"API request to {endpoint} failed: {e}")
 
+        if stream_xml:
+            try:
+                if 'xml' in response.headers.get('Content-Type', ''):
+                    return await self._stream_feed(response)
+                await response.aread()
+            except httpx.HTTPError as e:
+                # The streamed body is read after the request itself succeeded, so report it the same way
+                logging.error(f"API request to {endpoint} failed: {e}")
+                raise Exception(f"API request to {endpoint} failed: {e}")
+            finally:
+                await response.aclose()
+        result = self._parse_response(response)
+        if cache_key is not None:
+            # Skip the store if a write invalidated this endpoint while the request was in flight
+            if self._cache_generations.get(endpoint, 0) == generation:
+                self._cache[cache_key] = result
+        elif method == "POST":
+            self.invalidate_cache(*self.INVALIDATED_BY.get(endpoint, ()))
+        return result
+
 
 # --- MCP Server Setup ---
 
+# Number of MCP sessions currently using the shared HTTP client
+_active_sessions = 0
+# Background login/connection warm-up started by the first session
+_warm_up_task: Optional[asyncio.Task] = None
+
+async def _warm_up():
+    """Logs in and opens a pooled (HTTP/2) connection before the first tool call needs it."""
+    try:
+        await client.ensure_authenticated()
+        await client.make_request("GET", "user-info")
+    except Exception as e:
+        logging.warning(f"Connection warm-up failed: {e}")
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """
+    Starts warming up the API connection for the first MCP session,
+    and closes the connection after the last session ends.
+    """
+    global _active_sessions, _warm_up_task
+    _active_sessions += 1
+    try:
+        if _active_sessions == 1:
+            # Run in the background so the MCP handshake never waits on the upstream server
+            _warm_up_task = asyncio.create_task(_warm_up())
+        yield
+    finally:
+        _active_sessions -= 1
+        if not _active_sessions:
+            if _warm_up_task is not None:
+                _warm_up_task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await _warm_up_task
+                _warm_up_task = None
+            await client.aclose()
+
 mcp = FastMCP(
     name="FreshAPI & Google Reader API Server",
     instructions="An MCP server to interact with a Google Reader compatible API (like FreshRSS).",
     host="0.0.0.0",
-    port=8000
+    port=8000,
+    lifespan=lifespan
     )
 
+# Constructing the client only validates configuration (failing fast on missing credentials);
+# login and the TLS handshake run in the background from the lifespan hook, overlapping the MCP handshake
 client = GoogleReaderClient()
 
+# Maximum number of values sent for a list parameter in a single request
+BATCH_SIZE = 50
+# Maximum number of batches in flight at once, to avoid overwhelming self-hosted servers (e.g. SQLite locks)
+BATCH_CONCURRENCY = 4
+
+FORM_HEADERS = {'Content-Type': 'application/x-www-form-urlencoded'}
+
+# Fixed form fields shared by the edit-tag tools, merged into each request's data
+MARK_READ_FIELDS = {'ac': 'edit-tags', 'a': 'user/-/state/com.google/read'}
+MARK_UNREAD_FIELDS = {'ac': 'edit-tags', 'r': 'user/-/state/com.google/read'}
+SHARE_FIELDS = {'a': 'user/-/state/com.google/broadcast'}
+UNSHARE_FIELDS = {'r': 'user/-/state/com.google/broadcast'}
+
+def _as_int(value: Optional[Union[int, str]], name: str) -> Optional[int]:
+    """Converts a numeric tool argument (which clients may send as a string) to int, passing None through."""
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        raise ValueError(f"{name} must be a valid integer.")
+
+def encode_form(data: dict) -> bytes:
+    """URL-encodes form fields into a request body once, expanding lists into repeated keys."""
+    return urlencode(data, doseq=True).encode()
+
+def _merge_batch_results(results: list):
+    """Combines the responses of a batched request into a single result."""
+    if all(isinstance(result, dict) and 'items' in result for result in results):
+        merged = dict(results[0])
+        merged['items'] = [item for result in results for item in result['items']]
+        return merged
+    if all(result == results[0] for result in results):
+        return results[0]
+    return results
+
+async def make_batched_request(method, endpoint: str, data: dict, batch_key: str, **kwargs):
+    """
+    Splits the list in `data[batch_key]` into chunks of BATCH_SIZE and sends them concurrently.
+    Servers like FreshRSS cap list parameters, so large lists are otherwise silently truncated.
+    """
+    values = data[batch_key]
+    chunks = [values[i:i + BATCH_SIZE] for i in range(0, len(values), BATCH_SIZE)] or [values]
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def send(chunk):
+        async with semaphore:
+            return await client.make_request(
+                method, endpoint, content=encode_form({**data, batch_key: chunk}), headers=FORM_HEADERS, **kwargs
+            )
+
+    results = await asyncio.gather(*(send(chunk) for chunk in chunks))
+    return _merge_batch_results(results)
+
 @mcp.tool()
 async def add_subscription(feed_url: str, folder: Optional[str] = None, title: Optional[str] = None):
     """
@@ -170,7 +480,7 @@ async def add_subscription(feed_url: str, folder: Optional[str] = None, title: O
         data['a'] = f"user/-/label/{folder}"
     if title:
         data['t'] = title
-    return client.make_request("POST", "subscription/edit", data=data)
+    return await client.make_request("POST", "subscription/edit", data=data)
 
 @mcp.tool()
 async def quick_add_subscription(feed_url: str):
@@ -179,7 +489,7 @@ async def quick_add_subscription(feed_url: str):
     :param feed_url: The URL of the RSS feed to quickly subscribe to.
     """
     data = {'quickadd': f"feed/{feed_url}"}
-    return client.make_request("POST", "subscription/quickadd", data=data)
+    return await client.make_request("POST", "subscription/quickadd", data=data)
 
 @mcp.tool()
 async def get_subscription_list(output_format: str = "json"):
@@ -188,7 +498,7 @@ async def get_subscription_list(output_format: str = "json"):
     :param output_format: The desired output format (json or xml).
     """
     params = {'output': output_format}
-    return client.make_request("GET", "subscription/list", params=params)
+    return await client.make_request("GET", "subscription/list", params=params)
 
 @mcp.tool()
 async def get_unread_count(output_format: str = "json"):
@@ -197,12 +507,12 @@ async def get_unread_count(output_format: str = "json"):
     :param output_format: The desired output format (json or xml).
     """
     params = {'output': output_format}
-    return client.make_request("GET", "unread-count", params=params)
+    return await client.make_request("GET", "unread-count", params=params)
 
 @mcp.tool()
 async def get_user_info():
     """Retrieves information about the current user."""
-    return client.make_request("GET", "user-info")
+    return await client.make_request("GET", "user-info")
 
 @mcp.tool()
 async def delete_subscription(feed_ids: List[str]):
@@ -211,7 +521,7 @@ async def delete_subscription(feed_ids: List[str]):
     :param feed_ids: A list of feed IDs to delete, e.g., ['feed/52', 'feed/53'].
     """
     data = {'ac': 'unsubscribe', 's': feed_ids}
-    return client.make_request("POST", "subscription/edit", data=data)
+    return await make_batched_request("POST", "subscription/edit", data, 's')
 
 @mcp.tool()
 async def mark_feed_as_read(feed_url: str, timestamp: Union[int, str]):
@@ -220,12 +530,8 @@ async def mark_feed_as_read(feed_url: str, timestamp: Union[int, str]):
     :param feed_url: The URL of the feed to mark as read.
     :param timestamp: Timestamp to mark read time.
     """
-    try:
-        timestamp = int(timestamp)
-    except (ValueError, TypeError):
-        raise ValueError("Timestamp must be a valid integer.")
-    data = {'s': f'feed/{feed_url}', 'ts': timestamp}
-    return client.make_request("POST", "mark-all-as-read", data=data)
+    data = {'s': f'feed/{feed_url}', 'ts': _as_int(timestamp, "timestamp")}
+    return await client.make_request("POST", "mark-all-as-read", data=data)
 
 
 @mcp.tool()
@@ -235,12 +541,8 @@ async def mark_folder_as_read(folder_name: str, timestamp: Union[int, str]):
     :param folder_name: The name of the folder to mark as read.
     :param timestamp: Timestamp to mark read time.
     """
-    try:
-        timestamp = int(timestamp)
-    except (ValueError, TypeError):
-        raise ValueError("Timestamp must be a valid integer.")
-    data = {'t': folder_name, 'ts': timestamp}
-    return client.make_request("POST", "mark-all-as-read", data=data)
+    data = {'t': folder_name, 'ts': _as_int(timestamp, "timestamp")}
+    return await client.make_request("POST", "mark-all-as-read", data=data)
 
 
 @mcp.tool()
@@ -251,15 +553,10 @@ async def mark_article_as_read(entry_id: str, feed_url: Optional[str] = None, as
     :param feed_url: The URL of the feed the article belongs to (optional).
     :param async_op: Whether to perform the operation asynchronously.
     """
-    data = {
-        'ac': 'edit-tags',
-        'i': entry_id,
-        'a': 'user/-/state/com.google/read',
-        'async': str(async_op).lower()
-    }
+    data = {**MARK_READ_FIELDS, 'i': entry_id, 'async': 'true' if async_op else 'false'}
     if feed_url:
         data['s'] = f'feed/{feed_url}'
-    return client.make_request("POST", "edit-tag", data=data)
+    return await client.make_request("POST", "edit-tag", data=data)
 
 
 @mcp.tool()
@@ -269,13 +566,8 @@ async def mark_article_as_unread(entry_id: str, async_op: bool = True):
     :param entry_id: The ID of the entry to mark as unread.
     :param async_op: Whether to perform the operation asynchronously.
     """
-    data = {
-        'ac': 'edit-tags',
-        'i': entry_id,
-        'r': 'user/-/state/com.google/read',
-        'async': str(async_op).lower()
-    }
-    return client.make_request("POST", "edit-tag", data=data)
+    data = {**MARK_UNREAD_FIELDS, 'i': entry_id, 'async': 'true' if async_op else 'false'}
+    return await client.make_request("POST", "edit-tag", data=data)
 
 
 @mcp.tool()
@@ -285,13 +577,8 @@ async def mark_articles_as_read(entry_ids: List[str], async_op: bool = True):
     :param entry_ids: A list of entry IDs to mark as read.
     :param async_op: Whether to perform the operation asynchronously.
     """
-    data = {
-        'ac': 'edit-tags',
-        'a': 'user/-/state/com.google/read',
-        'i': entry_ids,
-        'async': str(async_op).lower()
-    }
-    return client.make_request("POST", "edit-tag", data=data)
+    data = {**MARK_READ_FIELDS, 'i': entry_ids, 'async': 'true' if async_op else 'false'}
+    return await make_batched_request("POST", "edit-tag", data, 'i')
 
 @mcp.tool()
 async def create_folder(folder_name: str, feed_url: str):
@@ -306,7 +593,7 @@ async def create_folder(folder_name: str, feed_url: str):
         'a': f'user/-/label/{folder_name}',
         's': f'feed/{feed_url}'
     }
-    return client.make_request("POST", "edit-tag", data=data)
+    return await client.make_request("POST", "edit-tag", data=data)
 
 
 @mcp.tool()
@@ -316,13 +603,8 @@ async def share_article(entry_id: str, stream_id: str):
     :param entry_id: The ID of the entry to share.
     :param stream_id: The stream ID of the entry.
     """
-    data = {
-        'a': 'user/-/state/com.google/broadcast',
-        'i': entry_id,
-        's': stream_id,
-        'async': 'true'
-    }
-    return client.make_request("POST", "edit-tag", data=data)
+    data = {**SHARE_FIELDS, 'i': entry_id, 's': stream_id, 'async': 'true'}
+    return await client.make_request("POST", "edit-tag", data=data)
 
 
 @mcp.tool()
@@ -336,9 +618,9 @@ async def add_tag_to_item(entry_id: str, tag_name: str, async_op: bool = True):
     data = {
         'i': entry_id,
         'a': f'user/-/label/{tag_name}',
-        'async': str(async_op).lower()
+        'async': 'true' if async_op else 'false'
     }
-    return client.make_request("POST", "edit-tag", data=data)
+    return await client.make_request("POST", "edit-tag", data=data)
 
 
 @mcp.tool()
@@ -352,9 +634,9 @@ async def add_tags_to_item(entry_id: str, tag_names: List[str], async_op: bool =
     data = {
         'i': entry_id,
         'a': [f'user/-/label/{tag}' for tag in tag_names],
-        'async': str(async_op).lower()
+        'async': 'true' if async_op else 'false'
     }
-    return client.make_request("POST", "edit-tag", data=data)
+    return await make_batched_request("POST", "edit-tag", data, 'a')
 
 
 @mcp.tool()
@@ -368,7 +650,7 @@ async def delete_folder(folder_name: str):
         's': f'user/-/label/{folder_name}',
         't': folder_name
     }
-    return client.make_request("POST", "disable-tag", data=data)
+    return await client.make_request("POST", "disable-tag", data=data)
 
 
 @mcp.tool()
@@ -382,9 +664,9 @@ async def remove_tag_from_item(entry_id: str, tag_name: str, async_op: bool = Tr
     data = {
         'r': f'user/-/label/{tag_name}',
         'i': entry_id,
-        'async': str(async_op).lower()
+        'async': 'true' if async_op else 'false'
     }
-    return client.make_request("POST", "edit-tag", data=data)
+    return await client.make_request("POST", "edit-tag", data=data)
 
 
 @mcp.tool()
@@ -397,7 +679,7 @@ async def remove_tag_from_all_articles(tag_name: str):
         's': f'user/-/label/{tag_name}',
         't': tag_name
     }
-    return client.make_request("POST", "disable-tag", data=data)
+    return await client.make_request("POST", "disable-tag", data=data)
 
 
 @mcp.tool()
@@ -414,7 +696,7 @@ async def move_subscription(feed_url: str, old_folder: str, new_folder: str):
         'r': f'user/-/label/{old_folder}',
         'a': f'user/-/label/{new_folder}'
     }
-    return client.make_request("POST", "subscription/edit", data=data)
+    return await client.make_request("POST", "subscription/edit", data=data)
 
 
 @mcp.tool()
@@ -429,7 +711,7 @@ async def rename_subscription(feed_url: str, new_title: str):
         's': f'feed/{feed_url}',
         't': new_title
     }
-    return client.make_request("POST", "subscription/edit", data=data)
+    return await client.make_request("POST", "subscription/edit", data=data)
 
 
 @mcp.tool()
@@ -439,12 +721,8 @@ async def cancel_article_sharing(entry_id: str, async_op: bool = True):
     :param entry_id: The ID of the entry to stop sharing.
     :param async_op: Whether to perform the operation asynchronously.
     """
-    data = {
-        'r': 'user/-/state/com.google/broadcast',
-        'i': entry_id,
-        'async': str(async_op).lower()
-    }
-    return client.make_request("POST", "edit-tag", data=data)
+    data = {**UNSHARE_FIELDS, 'i': entry_id, 'async': 'true' if async_op else 'false'}
+    return await client.make_request("POST", "edit-tag", data=data)
 
 
 @mcp.tool()
@@ -457,10 +735,10 @@ async def set_tag_sharing(tag_name: str, is_public: bool):
     data = {
         's': f'user/-/label/{tag_name}',
         't': tag_name,
-        'pub': str(is_public).lower()
+        'pub': 'true' if is_public else 'false'
     }
     params = {'client': 'settings'}
-    return client.make_request("POST", "tag/edit", data=data, params=params)
+    return await client.make_request("POST", "tag/edit", data=data, params=params)
 
 
 @mcp.tool()
@@ -483,39 +761,27 @@ async def get_all_entries(
     :param continuation: Continuation string for pagination.
     :param output_format: The desired output format (json or xml).
     """
-    try:
-        count = int(count)
-        if newer_than is not None:
-            newer_than = int(newer_than)
-        if older_than is not None:
-            older_than = int(older_than)
-    except (ValueError, TypeError):
-        raise ValueError("count, newer_than, and older_than must be valid integers.")
+    count = _as_int(count, "count")
+    newer_than = _as_int(newer_than, "newer_than")
+    older_than = _as_int(older_than, "older_than")
     endpoint = "stream/contents/user/-/state/com.google/reading-list"
-    params = {'output': output_format, 'n': count}
-    if sort_order:
-        params['r'] = sort_order
-    if newer_than:
-        params['t'] = newer_than
-    if older_than:
-        params['ot'] = older_than
-    if exclude_target:
-        params['xt'] = exclude_target
-    if continuation:
-        params['c'] = continuation
-    return client.make_request("GET", endpoint, params=params)
+    params = {k: v for k, v in (
+        ('output', output_format), ('n', count), ('r', sort_order), ('t', newer_than),
+        ('ot', older_than), ('xt', exclude_target), ('c', continuation)
+    ) if v is not None and v != ''}
+    return await client.make_request("GET", endpoint, params=params, stream_xml=output_format == "xml")
 
 
 @mcp.tool()
 async def get_friend_list():
     """Retrieves the user's friend list."""
-    return client.make_request("GET", "friend/list")
+    return await client.make_request("GET", "friend/list")
 
 
 @mcp.tool()
 async def get_preference_list():
     """Retrieves the user's preference list."""
-    return client.make_request("GET", "preference/list")
+    return await client.make_request("GET", "preference/list")
 
 
 @mcp.tool()
@@ -525,13 +791,10 @@ async def get_starred_articles(count: Union[int, str] = 20, output_format: str =
     :param count: The maximum number of starred articles to retrieve (max 1000).
     :param output_format: The desired output format (json or xml).
     """
-    try:
-        count = int(count)
-    except (ValueError, TypeError):
-        raise ValueError("count must be a valid integer.")
+    count = _as_int(count, "count")
     endpoint = "stream/contents/user/-/state/com.google/starred"
     params = {'n': count, 'output': output_format}
-    return client.make_request("GET", endpoint, params=params)
+    return await client.make_request("GET", endpoint, params=params)
 
 
 @mcp.tool()
@@ -542,20 +805,14 @@ async def parse_feed_url(feed_url: str, count: Union[int, str] = 20, exclude_tar
     :param count: Number of entries to load.
     :param exclude_target: Label to exclude from the results.
     """
-    try:
-        count = int(count)
-    except (ValueError, TypeError):
-        raise ValueError("count must be a valid integer.")
-    # For this special case, we construct the full URL manually to avoid issues with
-    # the requests library parsing a URL within the path.
-    base = client.base_url.rstrip('/')
-    full_url = f"{base}/reader/api/0/atom/feed/{feed_url}"
+    count = _as_int(count, "count")
+    # For this special case, we construct the full URL manually; the feed URL is encoded as a
+    # single path segment so its own '?', '#' and '%' are not parsed as part of the request URL.
+    full_url = f"{client.api_url}/atom/feed/{quote(feed_url, safe='')}"
     
-    params = {'n': count}
-    if exclude_target:
-        params['xt'] = exclude_target
-        
-    return client.make_request("GET", endpoint=None, full_url=full_url, params=params)
+    params = {k: v for k, v in (('n', count), ('xt', exclude_target)) if v is not None and v != ''}
+
+    return await client.make_request("GET", endpoint=None, full_url=full_url, params=params, stream_xml=True)
 
 
 @mcp.tool()
@@ -580,29 +837,15 @@ async def freshapi_get_stream_item_ids(
     :param stop_time: The time until which you want to retrieve items (Unix timestamp).
     :param filter_target: Label to include in the results.
     """
-    try:
-        count = int(count)
-        if start_time is not None:
-            start_time = int(start_time)
-        if stop_time is not None:
-            stop_time = int(stop_time)
-    except (ValueError, TypeError):
-        raise ValueError("count, start_time, and stop_time must be valid integers.")
+    count = _as_int(count, "count")
+    start_time = _as_int(start_time, "start_time")
+    stop_time = _as_int(stop_time, "stop_time")
     endpoint = "stream/items/ids"
-    params = {'s': stream_id, 'n': count}
-    if sort_order:
-        params['r'] = sort_order
-    if continuation:
-        params['c'] = continuation
-    if exclude_target:
-        params['xt'] = exclude_target
-    if start_time:
-        params['ot'] = start_time
-    if stop_time:
-        params['nt'] = stop_time
-    if filter_target:
-        params['it'] = filter_target
-    return client.make_request("GET", endpoint, params=params)
+    params = {k: v for k, v in (
+        ('s', stream_id), ('n', count), ('r', sort_order), ('c', continuation),
+        ('xt', exclude_target), ('ot', start_time), ('nt', stop_time), ('it', filter_target)
+    ) if v is not None and v != ''}
+    return await client.make_request("GET", endpoint, params=params)
 
 
 @mcp.tool()
@@ -613,7 +856,7 @@ async def freshapi_get_stream_item_contents(item_ids: List[str]):
     """
     endpoint = "stream/items/contents"
     data = {'i': item_ids}
-    return client.make_request("POST", endpoint, data=data)
+    return await make_batched_request("POST", endpoint, data, 'i')
 
 
 @mcp.tool()
@@ -622,13 +865,10 @@ async def get_shared_entries(count: Union[int, str] = 20):
     Retrieves the user's shared entries.
     :param count: The number of shared articles to retrieve.
     """
-    try:
-        count = int(count)
-    except (ValueError, TypeError):
-        raise ValueError("count must be a valid integer.")
+    count = _as_int(count, "count")
     endpoint = "reader/atom/user/-/state/com.google/broadcast"
     params = {'n': count}
-    return client.make_request("GET", endpoint, params=params)
+    return await client.make_request("GET", endpoint, params=params)
 
 
 @mcp.tool()
@@ -638,7 +878,7 @@ async def get_tag_list(output_format: str = "json"):
     :param output_format: The desired output format (json or xml).
     """
     params = {'output': output_format}
-    return client.make_request("GET", "tag/list", params=params)
+    return await client.make_request("GET", "tag/list", params=params)
 
 
 @mcp.tool()
@@ -648,7 +888,7 @@ async def search_greader_categories(search_term: str):
     :param search_term: The keyword to search for.
     """
     params = {'q': search_term}
-    return client.make_request("GET", "directory/search", use_api_0_path=False, params=params)
+    return await client.make_request("GET", "directory/search", use_api_0_path=False, params=params)
 
 
 @mcp.tool()
@@ -659,7 +899,7 @@ async def search_item_ids(search_term: str, output_format: str = "json"):
     :param output_format: The desired output format (json or xml).
     """
     params = {'q': search_term, 'output': output_format}
-    return client.make_request("GET", "search/items/ids", params=params)
+    return await client.make_request("GET", "search/items/ids", params=params)
 
 
 @mcp.tool()
@@ -671,7 +911,9 @@ async def get_item_contents(item_ids: List[str], output_format: str = "json"):
     """
     data = {'i': item_ids}
     params = {'output': output_format}
-    return client.make_request("POST", "stream/items/contents", data=data, params=params)
+    return await client.make_request(
+        "POST", "stream/items/contents", content=encode_form(data), headers=FORM_HEADERS, params=params
+    )
 
 
 if __name__ == "__main__":